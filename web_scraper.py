@@ -1,10 +1,47 @@
 import requests
-from bs4 import BeautifulSoup, NavigableString
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, FeatureNotFound, NavigableString
 import argparse
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, urljoin
 import string
+from io import BytesIO
+
+try:
+    from lxml import etree
+    SITEMAP_PARSE_OPTIONS = {'resolve_entities': False, 'no_network': True}
+except ImportError:
+    import xml.etree.ElementTree as etree
+    SITEMAP_PARSE_OPTIONS = {}
+
+REQUEST_TIMEOUT = 10
+DEFAULT_WORKERS = 8
+MAX_RETRY_AFTER = 30
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+SITEMAP_LOC_TAG = '{http://www.sitemaps.org/schemas/sitemap/0.9}loc'
+
+session = requests.Session()
+
+class CappedRetry(Retry):
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+def mount_adapter(pool_size):
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=CappedRetry(total=3, backoff_factor=1, status_forcelist=[429, 502, 503, 504], raise_on_status=False),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+mount_adapter(DEFAULT_WORKERS)
 
 def get_domain_name(url):
     parsed_url = urlparse(url)
@@ -12,28 +49,36 @@ def get_domain_name(url):
     return domain.replace('www.', '')
 
 def is_meaningful(text):
-    cleaned_text = text.translate(str.maketrans('', '', string.punctuation)).lower()
+    cleaned_text = text.translate(PUNCTUATION_TABLE).lower()
     words = cleaned_text.split()
     if len(words) < 2:
         return False
     alphanumeric_ratio = sum(c.isalnum() for c in cleaned_text) / len(cleaned_text) if cleaned_text else 0
     return alphanumeric_ratio > 0.5
 
-def extract_text_from_url(url, output_file):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
+def parse_html(markup, encoding=None):
+    try:
+        return BeautifulSoup(markup, 'lxml', from_encoding=encoding)
+    except FeatureNotFound:
+        return BeautifulSoup(markup, 'html.parser', from_encoding=encoding)
 
-    last_content = ""
+def extract_text_from_url(url):
+    response = session.get(url, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    has_charset = 'charset=' in response.headers.get('Content-Type', '').lower()
+    soup = parse_html(response.content, response.encoding if has_charset else None)
 
-    def write_and_print(text):
-        nonlocal last_content
-        if text.strip() and text.strip() != last_content and is_meaningful(text):
-            print(text)
-            output_file.write(text + '\n')
-            last_content = text.strip()
+    lines = []
+    seen = set()
+
+    def add_line(text):
+        stripped = text.strip()
+        if stripped and stripped not in seen and is_meaningful(text):
+            lines.append(text)
+            seen.add(stripped)
 
     title = soup.title.string if soup.title else "No title found"
-    write_and_print(f"Title: {title}\n")
+    add_line(f"Title: {title}\n")
 
     main_content = soup.body or soup
 
@@ -44,15 +89,23 @@ def extract_text_from_url(url, output_file):
         if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
             header_text = element.text.strip()
             if len(header_text) > 1 and not header_text.isdigit():
-                write_and_print(f"\n{element.name.upper()}: {header_text}")
+                add_line(f"\n{element.name.upper()}: {header_text}")
         elif element.name == 'p':
-            write_and_print(element.text.strip())
+            add_line(element.text.strip())
         elif element.name == 'ul':
             items = [li.text.strip() for li in element.find_all('li', recursive=False)]
-            write_and_print("Unordered List: " + ", ".join(items))
+            add_line("Unordered List: " + ", ".join(items))
         elif element.name == 'ol':
             items = [li.text.strip() for li in element.find_all('li', recursive=False)]
-            write_and_print("Ordered List: " + ", ".join(items))
+            add_line("Ordered List: " + ", ".join(items))
+
+    return lines
+
+def iter_sitemap_locs(data):
+    for _, element in etree.iterparse(BytesIO(data), **SITEMAP_PARSE_OPTIONS):
+        if element.tag == SITEMAP_LOC_TAG and not len(element):
+            yield element.text
+        element.clear()
 
 def get_sitemap_urls(base_url):
     common_sitemap_paths = [
@@ -66,18 +119,17 @@ def get_sitemap_urls(base_url):
     for path in common_sitemap_paths:
         sitemap_url = urljoin(base_url, path)
         try:
-            response = requests.get(sitemap_url)
+            response = session.get(sitemap_url, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()  # Raise an exception for bad status codes
 
             if 'xml' in response.headers.get('Content-Type', '').lower():
-                root = ET.fromstring(response.content)
-                urls = [url.text for url in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}loc')]
+                urls = list(dict.fromkeys(iter_sitemap_locs(response.content)))
                 if urls:
                     print(f"Sitemap found at: {sitemap_url}")
                     return urls
         except requests.RequestException as e:
             print(f"Error accessing {sitemap_url}: {e}")
-        except ET.ParseError:
+        except etree.ParseError:
             print(f"Error parsing XML from {sitemap_url}")
 
     print(f"No sitemap found. Scraping the provided URL: {base_url}")
@@ -96,26 +148,55 @@ def group_urls(urls):
         groups[group].append(url)
     return groups
 
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description="Web scraper for text content")
     parser.add_argument("url", help="Base URL to scrape")
     parser.add_argument("--sitemap", action="store_true", help="Attempt to find and scrape sitemap")
+    parser.add_argument("--workers", type=positive_int, default=DEFAULT_WORKERS, help="Number of pages to fetch in parallel")
     args = parser.parse_args()
 
+    mount_adapter(args.workers)
+
     urls = get_sitemap_urls(args.url) if args.sitemap else [args.url]
     grouped_urls = group_urls(urls)
 
     domain_name = get_domain_name(args.url)
 
-    for group, group_urls in grouped_urls.items():
-        output_filename = os.path.join(os.getcwd(), f"{domain_name}_{group}_content.txt")
-        with open(output_filename, 'w', encoding='utf-8') as output_file:
-            for url in group_urls:
-                print(f"\nScraping: {url}")
-                output_file.write(f"\n\n--- Content from: {url} ---\n\n")
-                extract_text_from_url(url, output_file)
-
-        print(f"Content for group '{group}' has been saved to {output_filename}")
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    try:
+        pages = {
+            url: executor.submit(extract_text_from_url, url)
+            for urls_in_group in grouped_urls.values()
+            for url in urls_in_group
+        }
+
+        for group, urls_in_group in grouped_urls.items():
+            output_filename = os.path.join(os.getcwd(), f"{domain_name}_{group}_content.txt")
+            with open(output_filename, 'w', encoding='utf-8') as output_file:
+                for url in urls_in_group:
+                    print(f"\nScraping: {url}")
+                    try:
+                        lines = pages.pop(url).result()
+                    except requests.RequestException as e:
+                        print(f"Error accessing {url}: {e}")
+                        continue
+
+                    output_file.write(f"\n\n--- Content from: {url} ---\n\n")
+                    for line in lines:
+                        print(line)
+                        output_file.write(line + '\n')
+
+            print(f"Content for group '{group}' has been saved to {output_filename}")
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
 
 if __name__ == "__main__":
     main()